@@ -18,9 +18,10 @@ import argparse
 
 import dash
 import diskcache
+import plotly.io as pio
 from dash import DiskcacheManager
 
-from demo_configs import APP_TITLE, THEME_COLOR, THEME_COLOR_SECONDARY
+from demo_configs import APP_TITLE, HOSTS, THEME_COLOR, THEME_COLOR_SECONDARY, VMS
 from demo_interface import create_interface
 
 # Essential for initializing callbacks. Do not remove.
@@ -38,6 +39,10 @@ import multiprocess
 if multiprocess.get_start_method(allow_none=True) is None:
     multiprocess.set_start_method("spawn")
 
+# Dash encodes callback responses with Plotly's JSON encoder. Require orjson rather than falling
+# back to the much slower standard library encoder when it is missing.
+pio.json.config.default_engine = "orjson"
+
 cache = diskcache.Cache("./cache")
 background_callback_manager = DiskcacheManager(cache)
 
@@ -83,8 +88,11 @@ with open("assets/__generated_theme.css", "w") as f:
 
 if __name__ == "__main__":
     # Imports the Dash HTML code and sets it in the app.
-    # Creates the visual layout and app (see `demo_interface.py`)
-    app.layout = create_interface()
+    # Creates the visual layout and app (see `demo_interface.py`), prefilled with the current
+    # state for the default slider values so it is generated once rather than on every page load.
+    # The prefilled state is shown on every page load, so it must not expire.
+    initial_state = demo_callbacks.generate_initial_state(VMS["value"], HOSTS["value"], expire=None)
+    app.layout = create_interface(initial_state.figures, initial_state.state_key)
 
     # Run the server
     app.run_server(debug=DEBUG)
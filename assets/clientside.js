@@ -0,0 +1,118 @@
+/*
+Copyright 2024 D-Wave
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+
+/*******************************************************************
+This file contains the clientside callback functions for this demo.
+These callbacks only update class names or unpack data that is already
+in the browser, so they run clientside to avoid a round trip to the
+server (see `demo_callbacks.py`).
+*******************************************************************/
+
+// How long the sliders need to be still before the current state is regenerated.
+const SLIDER_DEBOUNCE_MS = 200;
+
+let sliderDebounceTimer = null;
+let resolvePendingSliders = null;
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        /**
+         * Toggles a 'collapsed' class that hides and shows some aspect of the UI.
+         *
+         * @param {number} collapseTrigger The number of times a collapse button has been clicked.
+         * @param {string} toCollapseClass Current class name of the thing to collapse.
+         * @returns {string} The new class name of the thing to collapse.
+         */
+        toggleCollapsed: function (collapseTrigger, toCollapseClass) {
+            const classes = toCollapseClass ? toCollapseClass.split(" ") : [];
+            const index = classes.indexOf("collapsed");
+
+            if (index > -1) {
+                classes.splice(index, 1);
+            } else {
+                classes.push("collapsed");
+            }
+            return classes.join(" ");
+        },
+
+        /**
+         * Zooms in or out of a graph when the graph's magnifying button is clicked.
+         *
+         * @param {number[]} magnifying The number of times each magnifying button has been clicked.
+         * @param {string[]} graphClasses The class names of all the graphs.
+         * @returns {string[][]} The new graph class names and the new magnifying button class names.
+         */
+        magnify: function (magnifying, graphClasses) {
+            const noUpdate = window.dash_clientside.no_update;
+            const triggeredIndex = window.dash_clientside.callback_context.triggered_id.index;
+            const onePageCount = graphClasses.length / 2;
+            const onFirstPage = triggeredIndex < onePageCount;
+            const isExpanded = graphClasses[triggeredIndex].includes("graph-element-expanded");
+
+            const page = (value) => Array(onePageCount).fill(value);
+            const onPage = (value) =>
+                onFirstPage ? page(value).concat(page(noUpdate)) : page(noUpdate).concat(page(value));
+
+            if (isExpanded) {
+                return [onPage("graph-element"), onPage("magnifying")];
+            }
+
+            const graphClassNames = onPage("display-none");
+            const magClassNames = onPage("display-none");
+
+            graphClassNames[triggeredIndex] = "graph-element-expanded";
+            magClassNames[triggeredIndex] = "magnifying minus";
+
+            return [graphClassNames, magClassNames];
+        },
+
+        /**
+         * Unpacks a bundle of current state figures into the four current state graphs.
+         *
+         * @param {Object} bundle The memory percent, memory, CPU percent, and CPU figures.
+         * @returns {Object[]} The figures in graph order.
+         */
+        unpackFigures: function (bundle) {
+            if (!bundle) {
+                return Array(4).fill(window.dash_clientside.no_update);
+            }
+            return [bundle.mem_percent, bundle.mem, bundle.cpu_percent, bundle.cpu];
+        },
+
+        /**
+         * Passes on the slider values once they have not changed for `SLIDER_DEBOUNCE_MS`.
+         * Values that are superseded within that time resolve to `no_update`.
+         *
+         * @param {number} numVms The value of the virtual machine slider.
+         * @param {number} numHosts The value of the host slider.
+         * @returns {Promise<Object>} The slider values to store.
+         */
+        debounceSliders: function (numVms, numHosts) {
+            clearTimeout(sliderDebounceTimer);
+            if (resolvePendingSliders) {
+                resolvePendingSliders(window.dash_clientside.no_update);
+            }
+
+            return new Promise((resolve) => {
+                resolvePendingSliders = resolve;
+                sliderDebounceTimer = setTimeout(() => {
+                    resolvePendingSliders = null;
+                    resolve({ vms: numVms, hosts: numHosts });
+                }, SLIDER_DEBOUNCE_MS);
+            });
+        },
+    },
+});
@@ -14,19 +14,36 @@
 
 from __future__ import annotations
 
-from typing import NamedTuple
+import uuid
+from typing import Callable, NamedTuple
 
 import dash
+import diskcache
+import pandas as pd
 import plotly.graph_objs as go
-from dash import ALL, MATCH, ctx
-from dash.dependencies import Input, Output, State
+from dash import ALL, MATCH, Patch
+from dash.dependencies import ClientsideFunction, Input, Output, State
 
-from demo_configs import CPU_CAP, CPU_UNITS, MEMORY_CAP, MEMORY_UNITS
+from demo_configs import CPU_CAP, CPU_UNITS, MEMORY_CAP, MEMORY_UNITS, RANDOM_SEED
 from src import cqm_balancer, generate_charts, generate_data
 from src.demo_enums import PriorityType
 
+MEM_PERCENT_TITLE = "Percent Memory Used"
+CPU_PERCENT_TITLE = "Percent CPU Used"
+MEM_TITLE = f"Memory Usage per VM (max: {MEMORY_CAP} {MEMORY_UNITS})"
+CPU_TITLE = f"CPU Usage per VM (max: {CPU_CAP} {CPU_UNITS})"
 
-@dash.callback(
+# Generated VMs and hosts are kept server side and only their key is sent to the browser. A disk
+# cache is used so the state is shared with the background callback processes.
+state_cache = diskcache.Cache("./cache/state", eviction_policy="least-recently-used")
+
+# How long, in seconds, stored states are kept.
+STATE_EXPIRE = 24 * 60 * 60
+
+# Toggles a 'collapsed' class that hides and shows some aspect of the UI.
+# Runs in the browser, see ``toggleCollapsed`` in ``assets/clientside.js``.
+dash.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggleCollapsed"),
     Output({"type": "to-collapse-class", "index": MATCH}, "className"),
     inputs=[
         Input({"type": "collapse-trigger", "index": MATCH}, "n_clicks"),
@@ -34,26 +51,12 @@ from src.demo_enums import PriorityType
     ],
     prevent_initial_call=True,
 )
-def toggle_left_column(collapse_trigger: int, to_collapse_class: str) -> str:
-    """Toggles a 'collapsed' class that hides and shows some aspect of the UI.
 
-    Args:
-        collapse_trigger (int): The (total) number of times a collapse button has been clicked.
-        to_collapse_class (str): Current class name of the thing to collapse, 'collapsed' if not
-            visible, empty string if visible.
 
-    Returns:
-        str: The new class name of the thing to collapse.
-    """
-
-    classes = to_collapse_class.split(" ") if to_collapse_class else []
-    if "collapsed" in classes:
-        classes.remove("collapsed")
-        return " ".join(classes)
-    return to_collapse_class + " collapsed" if to_collapse_class else "collapsed"
-
-
-@dash.callback(
+# Zooms in or out of a graph when the graph's magnifying button is clicked.
+# Runs in the browser, see ``magnify`` in ``assets/clientside.js``.
+dash.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="magnify"),
     Output({"type": "graph", "index": ALL}, "className"),
     Output({"type": "magnifying", "index": ALL}, "className"),
     inputs=[
@@ -62,122 +65,226 @@ def toggle_left_column(collapse_trigger: int, to_collapse_class: str) -> str:
     ],
     prevent_initial_call=True,
 )
-def magnify_graph(
-    magnifying: int,
-    graph_classes: list[str],
-) -> tuple[list[str], list[str]]:
-    """Zooms in or out of a graph when the graph's magnifying button is clicked.
+
+
+class RenderInitialStateReturn(NamedTuple):
+    """Return type for the ``render_initial_state`` callback function."""
+
+    figures: dict[str, dict]
+    state_key: str
+
+
+def generate_vms_and_hosts(
+    num_vms: int, num_hosts: int, expire: float | None = STATE_EXPIRE
+) -> tuple[dict[dict], dict[dict], str]:
+    """Generates and stores the virtual machines and hosts.
+
+    If ``RANDOM_SEED`` is set, the generated data only depends on the number of virtual machines
+    and hosts, so the state stored for the same inputs is reused, e.g., when scrubbing a slider
+    back and forth. Otherwise, every call generates a new random state.
 
     Args:
-        magnifying (int): The number of times a magnifying button has been clicked.
-        graph_classes (list[str]): The class names of all the graphs.
+        num_vms: The number of virtual machines to generate.
+        num_hosts: The number of hosts to generate.
+        expire: Seconds until the stored state expires, or ``None`` to keep it.
 
     Returns:
-        list[str]: A list of the new graph class names.
-        list[str]: A list of the new magifying button class names.
+        tuple[dict, dict, str]: The dict of virtual machine dicts, the dict of host dicts, and the
+        key to load them with ``load_vms_and_hosts``.
     """
-    triggered_index = ctx.triggered_id["index"]
-    one_page_count = int(len(graph_classes) / 2)
+    if RANDOM_SEED is None:
+        state_key = uuid.uuid4().hex
+    else:
+        state_key = f"state_{RANDOM_SEED}_{num_vms}_{num_hosts}"
+        state = state_cache.get(state_key)
+        if state is not None:
+            return *state, state_key
 
-    no_update_page = [dash.no_update] * one_page_count
-    display_none_page = ["display-none"] * one_page_count
-    reset_graph_page = ["graph-element"] * one_page_count
-    reset_mag_page = ["magnifying"] * one_page_count
-    is_expanded = "graph-element-expanded" in graph_classes[triggered_index]
-    on_first_page = triggered_index < one_page_count
+    return *_store_vms_and_hosts(state_key, num_vms, num_hosts, expire), state_key
 
-    if on_first_page:  # On first page
-        if is_expanded:
-            return reset_graph_page + no_update_page, reset_mag_page + no_update_page
 
-        graph_class_names = display_none_page + no_update_page
-        mag_class_names = display_none_page + no_update_page
-    else:  # On second page
-        if is_expanded:
-            return no_update_page + reset_graph_page, no_update_page + reset_mag_page
+def _store_vms_and_hosts(
+    state_key: str, num_vms: int, num_hosts: int, expire: float | None = STATE_EXPIRE
+) -> tuple[dict[dict], dict[dict]]:
+    """Generates the virtual machines and hosts and stores them under ``state_key``."""
+    vms = generate_data.generate_vms(num_vms, num_hosts)
+    hosts = generate_data.generate_hosts(num_hosts, vms)
 
-        graph_class_names = no_update_page + display_none_page
-        mag_class_names = no_update_page + display_none_page
+    state_cache.set(state_key, (vms, hosts), expire=expire)
 
-    graph_class_names[triggered_index] = "graph-element-expanded"
-    mag_class_names[triggered_index] = "magnifying minus"
+    return vms, hosts
 
-    return graph_class_names, mag_class_names
 
+def load_vms_and_hosts(state_key: str) -> tuple[dict[dict], dict[dict]] | None:
+    """Loads a fresh copy of the virtual machines and hosts stored by ``generate_vms_and_hosts``.
 
-class RenderInitialStateReturn(NamedTuple):
-    """Return type for the ``render_initial_state`` callback function."""
+    Args:
+        state_key: The key returned by ``generate_vms_and_hosts``.
 
-    fig_mem_percent: go.Figure
-    fig_mem: go.Figure
-    fig_cpu_percent: go.Figure
-    fig_cpu: go.Figure
-    vms: dict[dict]
-    hosts: dict[dict]
+    Returns:
+        tuple[dict, dict] | None: The dict of virtual machine dicts and the dict of host dicts, or
+        ``None`` if the state has expired or was evicted.
+    """
+    return state_cache.get(state_key)
 
 
-@dash.callback(
-    Output({"type": "graph", "index": 0}, "figure"),
-    Output({"type": "graph", "index": 1}, "figure"),
-    Output({"type": "graph", "index": 2}, "figure"),
-    Output({"type": "graph", "index": 3}, "figure"),
-    Output("vms-store", "data"),
-    Output("hosts-store", "data"),
+def _build_figure(generate_chart: Callable[..., go.Figure], df: pd.DataFrame, *args) -> go.Figure:
+    """Builds a chart without caching it, with the same signature as ``cached_figure``."""
+    return generate_chart(df, *args)
+
+
+def generate_figures(
+    hosts: dict[dict],
+    vms: dict[dict],
+    patch_percent_charts: bool = False,
+    cache_figures: bool = True,
+) -> tuple[dict | go.Figure | Patch, dict | go.Figure, dict | go.Figure | Patch, dict | go.Figure]:
+    """Generates the memory and CPU figures for the given hosts and virtual machines.
+
+    Args:
+        hosts: A dict of host dicts containing the CPU and memory cap as well as
+            the current CPU and memory use.
+        vms: A dict of VM dicts containing current host and cpu and memory use.
+        patch_percent_charts: Whether the percent graphs already display a percent chart, in
+            which case only their changed data is sent.
+        cache_figures: Whether to reuse and cache the serialized figures (see
+            ``generate_charts.cached_figure``). Background callbacks run in a new process, where
+            the cache is always empty, so they build the figures directly.
+
+    Returns:
+        tuple: The memory percent, memory virtual machine, CPU percent, and CPU virtual machine
+        figures.
+    """
+    df_mem_percent, df_mem, df_cpu_percent, df_cpu = generate_charts.get_dfs(hosts, vms)
+
+    build_figure = generate_charts.cached_figure if cache_figures else _build_figure
+
+    if patch_percent_charts:
+        fig_mem_percent = generate_charts.patch_percent_chart(df_mem_percent)
+        fig_cpu_percent = generate_charts.patch_percent_chart(df_cpu_percent)
+    else:
+        fig_mem_percent = build_figure(
+            generate_charts.generate_percent_chart, df_mem_percent, MEM_PERCENT_TITLE
+        )
+        fig_cpu_percent = build_figure(
+            generate_charts.generate_percent_chart, df_cpu_percent, CPU_PERCENT_TITLE
+        )
+    fig_mem = build_figure(
+        generate_charts.generate_vm_bar_chart, df_mem, MEMORY_CAP, MEM_TITLE, MEMORY_UNITS
+    )
+    fig_cpu = build_figure(
+        generate_charts.generate_vm_bar_chart, df_cpu, CPU_CAP, CPU_TITLE, CPU_UNITS
+    )
+
+    return fig_mem_percent, fig_mem, fig_cpu_percent, fig_cpu
+
+
+def generate_figures_bundle(hosts: dict[dict], vms: dict[dict]) -> dict[str, dict]:
+    """Generates the bundle of current state figures unpacked into the graphs in the browser.
+
+    Args:
+        hosts: A dict of host dicts containing the CPU and memory cap as well as
+            the current CPU and memory use.
+        vms: A dict of VM dicts containing current host and cpu and memory use.
+
+    Returns:
+        dict[str, dict]: The memory percent, memory, CPU percent, and CPU figures.
+    """
+    fig_mem_percent, fig_mem, fig_cpu_percent, fig_cpu = generate_figures(hosts, vms)
+
+    return {
+        "mem_percent": fig_mem_percent,
+        "mem": fig_mem,
+        "cpu_percent": fig_cpu_percent,
+        "cpu": fig_cpu,
+    }
+
+
+def generate_initial_state(
+    num_vms: int, num_hosts: int, expire: float | None = STATE_EXPIRE
+) -> RenderInitialStateReturn:
+    """Generates the virtual machines and hosts and the figures of their current state.
+
+    Args:
+        num_vms: The number of virtual machines to generate.
+        num_hosts: The number of hosts to generate.
+        expire: Seconds until the stored state expires, or ``None`` to keep it.
+
+    Returns:
+        A NamedTuple (RenderInitialStateReturn) containing the bundle of the four current state
+        figures and the key of the stored virtual machines and hosts.
+    """
+    vms, hosts, state_key = generate_vms_and_hosts(num_vms, num_hosts, expire)
+
+    return RenderInitialStateReturn(
+        figures=generate_figures_bundle(hosts, vms), state_key=state_key
+    )
+
+
+# Collapses bursts of slider changes into one update of the current state.
+# Runs in the browser, see ``debounceSliders`` in ``assets/clientside.js``.
+dash.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="debounceSliders"),
+    Output("sliders-debounced", "data"),
     inputs=[
         Input("vms", "value"),
         Input("hosts", "value"),
+    ],
+    prevent_initial_call=True,
+)
+
+
+@dash.callback(
+    Output("initial-figures-bundle", "data"),
+    Output("state-store", "data"),
+    inputs=[
+        Input("sliders-debounced", "data"),
         State("priority", "value"),
     ],
+    prevent_initial_call=True,
 )
-def render_initial_state(num_vms: int, num_hosts: int, priority: int) -> RenderInitialStateReturn:
-    """Runs on load and any time the value of Virtual Machines or Hosts is updated.
+def render_initial_state(sliders: dict[str, int], priority: int) -> RenderInitialStateReturn:
+    """Runs any time the value of Virtual Machines or Hosts is updated and then left unchanged
+    briefly.
+
+    The state for the default slider values is prefilled in the layout (see ``app.py``), so this
+    callback does not run on page load. The figures are returned as a single bundle that is
+    unpacked into the graphs in the browser.
 
     Args:
-        num_vms (int): The value of the virtual machine slider.
-        num_hosts (int): The value of the host slider.
+        sliders (dict[str, int]): The debounced values of the virtual machine slider (``vms``)
+            and the host slider (``hosts``).
         priority (int): The value of the priority selector.
 
     Returns:
-        fig_mem_percent: The figure for the memory percent graph.
-        fig_mem: The figure for the memory virtual machine graph.
-        fig_cpu_percent: The figure for the CPU percent graph.
-        fig_cpu: The figure for the CPU virtual machine graph.
-        vms: The dict of virtual machine dictionaries to store.
-        hosts: The dict of host dictionaries to store.
+        figures: The bundle of the memory percent, memory virtual machine, CPU percent, and CPU
+            virtual machine figures, unpacked into the graphs in the browser.
+        state_key: The key of the stored virtual machines and hosts.
     """
-    vms = generate_data.generate_vms(num_vms, num_hosts)
-    hosts = generate_data.generate_hosts(num_hosts, vms)
+    return generate_initial_state(sliders["vms"], sliders["hosts"])
 
-    df_mem_percent, df_mem = generate_charts.get_df(hosts, vms, "mem")
-    df_cpu_percent, df_cpu = generate_charts.get_df(hosts, vms, "cpu")
 
-    fig_mem_percent = generate_charts.generate_percent_chart(df_mem_percent, "Percent Memory Used")
-    fig_cpu_percent = generate_charts.generate_percent_chart(df_cpu_percent, "Percent CPU Used")
-    fig_mem = generate_charts.generate_vm_bar_chart(
-        df_mem, MEMORY_CAP, f"Memory Usage per VM (Max: {MEMORY_CAP} {MEMORY_UNITS})", MEMORY_UNITS
-    )
-    fig_cpu = generate_charts.generate_vm_bar_chart(
-        df_cpu, CPU_CAP, f"CPU Usage per VM (Max: {CPU_CAP} {CPU_UNITS})", CPU_UNITS
-    )
-
-    return RenderInitialStateReturn(
-        fig_mem_percent=fig_mem_percent,
-        fig_mem=fig_mem,
-        fig_cpu_percent=fig_cpu_percent,
-        fig_cpu=fig_cpu,
-        vms=vms,
-        hosts=hosts,
-    )
+# Unpacks the bundle of current state figures into their graphs, including on page load.
+# Runs in the browser, see ``unpackFigures`` in ``assets/clientside.js``.
+dash.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="unpackFigures"),
+    Output({"type": "graph", "index": 0}, "figure"),
+    Output({"type": "graph", "index": 1}, "figure"),
+    Output({"type": "graph", "index": 2}, "figure"),
+    Output({"type": "graph", "index": 3}, "figure"),
+    inputs=[Input("initial-figures-bundle", "data")],
+)
 
 
 class RunOptimizationReturn(NamedTuple):
     """Return type for the ``run_optimization`` callback function."""
 
-    fig_mem_percent_result: go.Figure
+    fig_mem_percent_result: go.Figure | Patch
     fig_mem_result: go.Figure
-    fig_cpu_percent_result: go.Figure
+    fig_cpu_percent_result: go.Figure | Patch
     fig_cpu_result: go.Figure
     results_tabl_disabled: bool
+    initial_figures: dict[str, dict]  # Or ``dash.no_update`` if the state is unchanged.
 
 
 @dash.callback(
@@ -186,13 +293,16 @@ class RunOptimizationReturn(NamedTuple):
     Output({"type": "graph", "index": 6}, "figure"),
     Output({"type": "graph", "index": 7}, "figure"),
     Output("results-tab", "disabled"),
+    Output("initial-figures-bundle", "data", allow_duplicate=True),
     background=True,
     inputs=[
         Input("run-button", "n_clicks"),
         State("solver-time-limit", "value"),
         State("priority", "value"),
-        State("vms-store", "data"),
-        State("hosts-store", "data"),
+        State("state-store", "data"),
+        State("vms", "value"),
+        State("hosts", "value"),
+        State("results-tab", "disabled"),
     ],
     running=[
         (Output("cancel-button", "className"), "", "display-none"),  # Show/hide cancel button.
@@ -208,8 +318,10 @@ def run_optimization(
     run_click: int,
     time_limit: float,
     priority: int,
-    vms: dict[dict],
-    hosts: dict[dict],
+    state_key: str,
+    num_vms: int,
+    num_hosts: int,
+    results_tab_disabled: bool,
 ) -> RunOptimizationReturn:
     """Runs the optimization and updates UI accordingly.
 
@@ -222,8 +334,11 @@ def run_optimization(
         run_click: The (total) number of times the run button has been clicked.
         time_limit: The solver time limit.
         priority: The value of the priority selector.
-        vms: The dict of virtual machine dictionaries to store.
-        hosts: The dict of host dictionaries to store.
+        state_key: The key of the stored virtual machines and hosts.
+        num_vms: The value of the virtual machine slider.
+        num_hosts: The value of the host slider.
+        results_tab_disabled: Whether the results tab is disabled, i.e., whether the results
+            graphs have not been filled by a completed run yet.
 
     Returns:
         A NamedTuple (RunOptimizationReturn) containing all outputs to be used when updating the HTML
@@ -234,23 +349,30 @@ def run_optimization(
             fig_cpu_percent_result: The figure for the CPU percent graph.
             fig_cpu_result: The figure for the CPU virtual machine graph.
             results_tabl_disabled: Whether the results tab should be disabled.
+            initial_figures: The current state figures, if the state had to be generated again.
     """
+    state = load_vms_and_hosts(state_key)
+    if state is None:
+        # The state expired, so generate it again and show it as the current state, so that the
+        # results match the current state that is displayed.
+        vms, hosts = _store_vms_and_hosts(state_key, num_vms, num_hosts)
+        initial_figures = generate_figures_bundle(hosts, vms)
+    else:
+        vms, hosts = state
+        initial_figures = dash.no_update
+
     priority = PriorityType(priority)
     cqm = cqm_balancer.build_cqm(vms, hosts, priority)
     plan = cqm_balancer.get_solution(cqm, time_limit)
 
     resulting_hosts, resulting_vms = cqm_balancer.format_results(plan, vms, hosts)
 
-    df_mem_percent, df_mem = generate_charts.get_df(resulting_hosts, resulting_vms, "mem")
-    df_cpu_percent, df_cpu = generate_charts.get_df(resulting_hosts, resulting_vms, "cpu")
-
-    fig_mem_percent = generate_charts.generate_percent_chart(df_mem_percent, "Percent Memory Used")
-    fig_cpu_percent = generate_charts.generate_percent_chart(df_cpu_percent, "Percent CPU Used")
-    fig_mem = generate_charts.generate_vm_bar_chart(
-        df_mem, MEMORY_CAP, f"Memory Usage per VM (max: {MEMORY_CAP} {MEMORY_UNITS})", MEMORY_UNITS
-    )
-    fig_cpu = generate_charts.generate_vm_bar_chart(
-        df_cpu, CPU_CAP, f"CPU Usage per VM (max: {CPU_CAP} {CPU_UNITS})", CPU_UNITS
+    # Once the results graphs show a run, the percent charts only need their data patched.
+    fig_mem_percent, fig_mem, fig_cpu_percent, fig_cpu = generate_figures(
+        resulting_hosts,
+        resulting_vms,
+        patch_percent_charts=not results_tab_disabled,
+        cache_figures=False,
     )
 
     return RunOptimizationReturn(
@@ -259,4 +381,5 @@ def run_optimization(
         fig_cpu_percent_result=fig_cpu_percent,
         fig_cpu_result=fig_cpu,
         results_tabl_disabled=False,
+        initial_figures=initial_figures,
     )
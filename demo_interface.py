@@ -167,14 +167,23 @@ def generate_graph(index: int) -> html.Div:
     )
 
 
-def create_interface():
-    """Set the application HTML."""
+def create_interface(initial_figures: dict[str, dict], state_key: str):
+    """Set the application HTML.
+
+    The stores are prefilled with the current state, so that the initial render does not need a
+    server callback on every page load.
+
+    Args:
+        initial_figures: The bundle of the four current state figures.
+        state_key: The key of the stored virtual machines and hosts.
+    """
     return html.Div(
         id="app-container",
         children=[
             # Below are any temporary storage items, e.g., for sharing data between callbacks.
-            dcc.Store(id="vms-store"),
-            dcc.Store(id="hosts-store"),
+            dcc.Store(id="state-store", data=state_key),
+            dcc.Store(id="initial-figures-bundle", data=initial_figures),
+            dcc.Store(id="sliders-debounced"),
             # Header brand banner
             html.Div(className="banner", children=[html.Img(src=THUMBNAIL)]),
             # Settings and results columns
@@ -11,12 +11,32 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from dimod import Binary, ConstrainedQuadraticModel, quicksum
+import numpy as np
+from dimod import BINARY, BinaryQuadraticModel, ConstrainedQuadraticModel
 from dwave.system import LeapHybridCQMSampler
 
 from src.demo_enums import PriorityType
 
 
+def _sum_use_per_host(host_indices: np.ndarray, use: np.ndarray, num_hosts: int) -> np.ndarray:
+    """Sums the resource use of virtual machines per assigned host.
+
+    Args:
+        host_indices: The index of the host each virtual machine is assigned to.
+        use: An array of shape ``(num_vms, num_resources)`` of virtual machine resource use.
+        num_hosts: The total number of hosts.
+
+    Returns:
+        np.ndarray: An array of shape ``(num_hosts, num_resources)`` of resource use per host.
+    """
+    return np.column_stack(
+        [
+            np.bincount(host_indices, weights=use[:, i], minlength=num_hosts)
+            for i in range(use.shape[1])
+        ]
+    )
+
+
 def format_results(
     plan: list[str], vms: dict[dict], hosts: dict[dict]
 ) -> tuple[dict[dict], dict[dict]]:
@@ -28,21 +48,34 @@ def format_results(
         hosts: A dict of host dictionaries.
 
     Returns:
-        tuple[dict, dict]: The updated host dictionaries and 
+        tuple[dict, dict]: The updated host dictionaries and
         the updated virtual machine dictionaries.
     """
-    for host in hosts:
-        hosts[host]["cpu_used"] = 0
-        hosts[host]["mem_used"] = 0
-
+    vm_index = {vm_id: i for i, vm_id in enumerate(vms)}
+    host_index = {host_id: i for i, host_id in enumerate(hosts)}
+    # Without VMs, an empty list would give a 1-D array, so start from an empty two-column array.
+    vm_use = np.array(
+        [(vm["cpu"], vm["mem"]) for vm in vms.values()] or np.empty((0, 2)), dtype=np.float64
+    )
+
+    vm_indices = []
+    host_indices = []
     for assignment in plan:
         vm_id, host_assignment = assignment.split("_on_")
-        vm = vms[vm_id]
+        vm_indices.append(vm_index[vm_id])
+        host_indices.append(host_index[host_assignment])
+        vms[vm_id]["current_host"] = host_assignment
+        vms[vm_id]["host_idx"] = hosts[host_assignment]["host_idx"]
 
-        hosts[host_assignment]["cpu_used"] += vm["cpu"]
-        hosts[host_assignment]["mem_used"] += vm["mem"]
+    host_use = _sum_use_per_host(
+        np.array(host_indices, dtype=np.int64),
+        vm_use[np.array(vm_indices, dtype=np.int64)],
+        len(hosts),
+    )
 
-        vms[vm_id]["current_host"] = host_assignment
+    for host, (cpu_used, mem_used) in zip(hosts.values(), host_use.tolist()):
+        host["cpu_used"] = cpu_used
+        host["mem_used"] = mem_used
 
     return hosts, vms
 
@@ -61,11 +94,16 @@ def build_cqm(
     Returns:
         ConstrainedQuadraticModel: The CQM model.
     """
-    requested_cpu = {vm_id: vm_data["cpu"] for vm_id, vm_data in vms.items()}
-    requested_mem = {vm_id: vm_data["mem"] for vm_id, vm_data in vms.items()}
+    vm_ids = list(vms)
+    requested_cpu = np.fromiter(
+        (vm_data["cpu"] for vm_data in vms.values()), dtype=np.float64, count=len(vms)
+    )
+    requested_mem = np.fromiter(
+        (vm_data["mem"] for vm_data in vms.values()), dtype=np.float64, count=len(vms)
+    )
 
-    total_requested_cpu = sum(requested_cpu.values())
-    total_requested_mem = sum(requested_mem.values())
+    total_requested_cpu = float(requested_cpu.sum())
+    total_requested_mem = float(requested_mem.sum())
 
     available_cpu_per_host = {host_id: host_data["cpu_cap"] for host_id, host_data in hosts.items()}
     available_mem_per_host = {host_id: host_data["mem_cap"] for host_id, host_data in hosts.items()}
@@ -86,48 +124,44 @@ def build_cqm(
 
     cqm = ConstrainedQuadraticModel()
 
+    # Format each variable name once, as a VM by host matrix shared by all constraints.
+    host_ids = list(available_cpu_per_host)
+    names = [[f"{vm}_on_{host}" for host in host_ids] for vm in vm_ids]
+
+    # Ensure that each vm is only assigned to one host with one hot constraint. These are added
+    # before any other constraint so dimod does not scan the existing discrete constraints for
+    # overlaps with every variable.
+    for vm, vm_names in zip(vm_ids, names):
+        cqm.add_discrete(vm_names, label=f"discrete_{vm}")
+
+    cpu_coefficients = requested_cpu.tolist()
+    mem_coefficients = requested_mem.tolist()
+
     sum_cpu = {}
     sum_mem = {}
-    for host in available_cpu_per_host:
-        sum_cpu[f"cpu_{host}"] = quicksum(
-            requested_cpu[vm] * Binary(f"{vm}_on_{host}") for vm in requested_cpu
+    for host, host_names in zip(host_ids, zip(*names)):
+        # Build the linear sums directly from their coefficients.
+        sum_cpu[f"cpu_{host}"] = BinaryQuadraticModel(
+            dict(zip(host_names, cpu_coefficients)), {}, 0, BINARY
         )
-        sum_mem[f"mem_{host}"] = quicksum(
-            requested_mem[vm] * Binary(f"{vm}_on_{host}") for vm in requested_mem
+        sum_mem[f"mem_{host}"] = BinaryQuadraticModel(
+            dict(zip(host_names, mem_coefficients)), {}, 0, BINARY
         )
 
+    # The prioritized resource is balanced with a hard constraint, the other with a soft one.
+    cpu_weight, mem_weight = priority.constraint_weights
     for host in available_cpu_per_host:
-        if priority is PriorityType.CPU:
-            # Set CPU balancing as a hard constraint, memory balancing as a soft constraint.
-            cqm.add_constraint(
-                sum_cpu[f"cpu_{host}"] <= balanced_cpu[host],
-                label=f"cpu_{host}",
-                penalty="quadratic",
-            )
-            cqm.add_constraint(
-                sum_mem[f"mem_{host}"] <= balanced_mem[host],
-                label=f"mem_{host}",
-                penalty="quadratic",
-                weight=1,
-            )
-        else:
-            # Set memory balancing as a hard constraint, CPU balancing as a soft constraint.
-            cqm.add_constraint(
-                sum_cpu[f"cpu_{host}"] <= balanced_cpu[host],
-                label=f"cpu_{host}",
-                penalty="quadratic",
-                weight=1,
-            )
-            cqm.add_constraint(
-                sum_mem[f"mem_{host}"] <= balanced_mem[host],
-                label=f"mem_{host}",
-                penalty="quadratic",
-            )
-
-    # Ensure that each vm is only assigned to one host with one hot constraint.
-    for vm in requested_cpu:
-        cqm.add_discrete(
-            [f"{vm}_on_{host}" for host in available_cpu_per_host], label=f"discrete_{vm}"
+        cqm.add_constraint(
+            sum_cpu[f"cpu_{host}"] <= balanced_cpu[host],
+            label=f"cpu_{host}",
+            penalty="quadratic",
+            weight=cpu_weight,
+        )
+        cqm.add_constraint(
+            sum_mem[f"mem_{host}"] <= balanced_mem[host],
+            label=f"mem_{host}",
+            penalty="quadratic",
+            weight=mem_weight,
         )
 
     return cqm
@@ -146,8 +180,11 @@ def get_solution(cqm: ConstrainedQuadraticModel, time_limit: int) -> list[str]:
     sampler = LeapHybridCQMSampler()
     sampleset = sampler.sample_cqm(cqm, time_limit=time_limit, label="VM Balancing Demo")
 
-    best_result = sampleset.first.sample
+    # Select the variables set in the lowest-energy sample (``sampleset.first``) directly from
+    # the sample record rather than looping over the sample dict.
+    record = sampleset.record
+    best_result = record.sample[np.argmin(record.energy)]
 
-    result = [k for k, v in best_result.items() if v == 1]
+    result = np.array(list(sampleset.variables))[best_result.astype(bool)].tolist()
 
     return result
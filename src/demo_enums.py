@@ -27,3 +27,11 @@ class PriorityType(Enum):
             PriorityType.MEMORY: "Memory",
             PriorityType.CPU: "CPU",
         }[self]
+
+    @property
+    def constraint_weights(self):
+        """The CPU and memory balancing constraint weights, ``None`` for a hard constraint."""
+        return {
+            PriorityType.MEMORY: (1, None),
+            PriorityType.CPU: (None, 1),
+        }[self]
@@ -11,13 +11,116 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+import orjson
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objs as go
+import plotly.io as pio
+from dash import Patch
 
 Y_AXIS_LABEL = "Host"
 VM_LABEL = "Virtual Machine"
 
+FIGURE_CACHE_SIZE = 32
+
+# Above this many bars, the smallest VMs on each host are combined into a single bar.
+MAX_VISIBLE_BARS = 60
+
+# Layout shared by all charts, built once at import.
+_BASE_LAYOUT = go.Layout(
+    margin=dict(l=40, r=40, t=40, b=40),
+    showlegend=False,
+    font=dict(size=11),
+    xaxis=dict(type="linear"),
+)
+
+_figure_cache: OrderedDict[str, dict] = OrderedDict()
+
+
+def _sort_by_order(df: pd.DataFrame) -> pd.DataFrame:
+    """Sorts a DataFrame by its ``order`` column, skipping the sort if it is already in order.
+
+    Hosts and freshly generated VMs are created in host order, so usually no sort is needed.
+    """
+    if df["order"].is_monotonic_increasing:
+        return df
+
+    return df.sort_values(by=["order"], kind="stable")
+
+
+def _get_frames(
+    hosts: dict[dict], vms: dict[dict], resources: tuple[str, ...]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Builds a DataFrame of host percentages and a DataFrame of VM usage for all given resources
+        in a single pass over the hosts and virtual machines.
+
+    Args:
+        hosts: A dict of host dicts containing the CPU and memory cap as well as
+            the current CPU and memory use.
+        vms: A dict of VM dicts containing current host and cpu and memory use.
+        resources: The resources to include (any of ``mem`` and ``cpu``).
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: A DataFrame with a percentage column per resource for
+        each host and a DataFrame with a usage column per resource for each virtual machine, both
+        sorted by host.
+    """
+    host_ids = list(hosts)
+    host_keys = [f"{resource}_{key}" for resource in resources for key in ("used", "cap")]
+    host_use = np.array(
+        [[host_data[key] for key in host_keys] for host_data in hosts.values()],
+        dtype=np.float64,
+    ).reshape(len(hosts), len(resources), 2)
+    percentages = host_use[:, :, 0] / host_use[:, :, 1]
+    np.round(percentages, 3, out=percentages)
+    percentages *= 100
+
+    df_hosts = pd.DataFrame(
+        {
+            Y_AXIS_LABEL: host_ids,
+            **{resource: percentages[:, i] for i, resource in enumerate(resources)},
+            "order": np.fromiter(
+                (host_data["host_idx"] for host_data in hosts.values()),
+                dtype=np.int32,
+                count=len(hosts),
+            ),
+        }
+    )
+
+    vm_hosts = []
+    vm_order = []
+    vm_use = {resource: [] for resource in resources}
+    for vm_data in vms.values():
+        vm_hosts.append(vm_data["current_host"])
+        vm_order.append(vm_data["host_idx"])
+        for resource in resources:
+            vm_use[resource].append(vm_data[resource])
+
+    df_vms = pd.DataFrame(
+        {
+            Y_AXIS_LABEL: vm_hosts,
+            **{resource: np.array(use, dtype=np.float64) for resource, use in vm_use.items()},
+            VM_LABEL: list(vms),
+            "order": np.array(vm_order, dtype=np.int32),
+        }
+    )
+
+    return _sort_by_order(df_hosts), _sort_by_order(df_vms)
+
+
+def _select_resource(
+    df_hosts: pd.DataFrame, df_vms: pd.DataFrame, resource: str
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Selects the percentage and usage DataFrames of one resource from ``_get_frames`` output."""
+    df_percent = df_hosts[[Y_AXIS_LABEL, resource, "order"]].rename(columns={resource: "Percent"})
+    df = df_vms[[Y_AXIS_LABEL, resource, VM_LABEL, "order"]].rename(columns={resource: "Use"})
+
+    return df_percent, df
+
 
 def get_df(hosts: dict[dict], vms: dict[dict], resource: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Given lists of hosts and virtual machines, generates a DataFrame of VMs and a DataFrame of
@@ -34,37 +137,45 @@ def get_df(hosts: dict[dict], vms: dict[dict], resource: str) -> tuple[pd.DataFr
         for each host and a DataFrame containing the resource usage for each virtual machine
         assigned to each host.
     """
-    percentages = []
-
-    for host_id, host_data in hosts.items():
-        percentage = round(host_data[f"{resource}_used"] / host_data[f"{resource}_cap"], 3)
-        percentages.append((host_id, percentage))
-
-    vm_data_list = []
-    for vm_id, vm_data in vms.items():
-        vm_data_list.append(
-            {
-                Y_AXIS_LABEL: vm_data["current_host"],
-                "Use": vm_data[resource],
-                VM_LABEL: vm_id,
-                "order": int(vm_data["current_host"].split(" ")[1]),
-            }
-        )
+    return _select_resource(*_get_frames(hosts, vms, (resource,)), resource)
 
-    df = pd.DataFrame(vm_data_list).sort_values(by=["order"])
 
-    percentages = [
-        {
-            Y_AXIS_LABEL: host_id,
-            "Percent": percent * 100,
-            "order": int(host_id.split(" ")[1]),
-        }
-        for host_id, percent in percentages
-    ]
+def get_dfs(
+    hosts: dict[dict], vms: dict[dict]
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Given lists of hosts and virtual machines, generates the percentage and VM DataFrames for
+        both memory and CPU in a single pass.
 
-    df_percent = pd.DataFrame(percentages).sort_values(by=["order"])
+    Args:
+        hosts: A dict of host dicts containing the CPU and memory cap as well as
+            the current CPU and memory use.
+        vms: A dict of VM dicts containing current host and cpu and memory use.
 
-    return df_percent, df
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: The memory percentage,
+        memory usage, CPU percentage, and CPU usage DataFrames, as returned by ``get_df``.
+    """
+    df_hosts, df_vms = _get_frames(hosts, vms, ("mem", "cpu"))
+
+    return (
+        *_select_resource(df_hosts, df_vms, "mem"),
+        *_select_resource(df_hosts, df_vms, "cpu"),
+    )
+
+
+def get_mean_annotation(df: pd.DataFrame) -> tuple[float, str]:
+    """Gets the position and text of the mean line of a percent chart.
+
+    Args:
+        df (pd.DataFrame): A DataFrame containing the percentages plotted.
+
+    Returns:
+        tuple[float, str]: The mean percentage and the annotation text of the mean line.
+    """
+    mean = df["Percent"].mean()
+    sd = df["Percent"].std()
+
+    return mean, f"mean: {mean:.0f}% (standard deviation: {sd:.1f})"
 
 
 def generate_percent_chart(df: pd.DataFrame, title: str = "") -> go.Figure:
@@ -77,42 +188,105 @@ def generate_percent_chart(df: pd.DataFrame, title: str = "") -> go.Figure:
     Returns:
         go.Figure: A Plotly figure object.
     """
-    fig = px.bar(
-        df,
-        title=title,
-        y=Y_AXIS_LABEL,
-        x="Percent",
+    fig = go.Figure(
+        go.Bar(
+            x=df["Percent"].tolist(),
+            y=df[Y_AXIS_LABEL].tolist(),
+            orientation="h",
+            hovertemplate="%{x:.2f}%",
+        ),
+        layout=_BASE_LAYOUT,
     )
 
-    fig.update_traces(hovertemplate="%{x:.2f}%")
+    mean, mean_text = get_mean_annotation(df)
 
-    mean = df["Percent"].mean()
-    sd = df["Percent"].std()
-
-    fig.add_vline(
-        x=mean,
-        line_width=2,
-        line_color="red",
-        annotation_text=f"mean: {mean:.0f}% (standard deviation: {sd:.1f})",
-        line_dash="dash",
-        annotation_font_size=13,
-        annotation_position="top",
-        annotation_font_color="red",
-    )
-
-    fig.layout.xaxis.type = "linear"
-    fig.update_xaxes(range=[0, 100])
+    # Set the mean line directly in the layout, rather than through ``add_vline``, so the
+    # layout is updated only once.
     fig.update_layout(
-        margin=dict(l=40, r=40, t=40, b=40),
-        xaxis_title="Percent",
-        yaxis_title=None,
-        showlegend=False,
-        font=dict(size=11),
+        title_text=title,
+        xaxis_range=[0, 100],
+        xaxis_title_text="Percent",
+        shapes=[
+            dict(
+                type="line",
+                x0=mean,
+                x1=mean,
+                xref="x",
+                y0=0,
+                y1=1,
+                yref="y domain",
+                line=dict(color="red", width=2, dash="dash"),
+            )
+        ],
+        annotations=[
+            dict(
+                x=mean,
+                xref="x",
+                y=1,
+                yref="y domain",
+                text=mean_text,
+                showarrow=False,
+                xanchor="center",
+                yanchor="bottom",
+                font=dict(size=13, color="red"),
+            )
+        ],
     )
 
     return fig
 
 
+def patch_percent_chart(df: pd.DataFrame) -> Patch:
+    """Updates only the bars and mean line of a percent chart that is already displayed.
+
+    Args:
+        df (pd.DataFrame): A DataFrame containing the data to plot.
+
+    Returns:
+        Patch: A partial update of the figure made by ``generate_percent_chart``.
+    """
+    mean, mean_text = get_mean_annotation(df)
+
+    patch = Patch()
+    patch["data"][0]["x"] = df["Percent"].tolist()
+    patch["data"][0]["y"] = df[Y_AXIS_LABEL].tolist()
+    patch["layout"]["shapes"][0]["x0"] = mean
+    patch["layout"]["shapes"][0]["x1"] = mean
+    patch["layout"]["annotations"][0]["x"] = mean
+    patch["layout"]["annotations"][0]["text"] = mean_text
+
+    return patch
+
+
+def _aggregate_small_vms(df: pd.DataFrame, max_bars: int = MAX_VISIBLE_BARS) -> pd.DataFrame:
+    """Combines the smallest virtual machines on each host into one bar to bound the bar count.
+
+    Args:
+        df (pd.DataFrame): A DataFrame of VM usage as generated by ``get_df``.
+        max_bars: The maximum number of bars to show before aggregating.
+
+    Returns:
+        pd.DataFrame: The DataFrame with, for each host, its largest virtual machines followed by
+        one row summing the use of the rest.
+    """
+    if len(df) <= max_bars:
+        return df
+
+    per_host = max(1, max_bars // df[Y_AXIS_LABEL].nunique() - 1)
+    rank = df.groupby(Y_AXIS_LABEL, sort=False)["Use"].rank(method="first", ascending=False)
+    keep = rank <= per_host
+
+    others = (
+        df[~keep]
+        .groupby(Y_AXIS_LABEL, sort=False)
+        .agg(Use=("Use", "sum"), count=(VM_LABEL, "size"), order=("order", "first"))
+        .reset_index()
+    )
+    others[VM_LABEL] = others[Y_AXIS_LABEL] + ": " + others["count"].astype(str) + " other VMs"
+
+    return pd.concat([df[keep], others[df.columns]]).sort_values(by=["order"], kind="stable")
+
+
 def generate_vm_bar_chart(
     df: pd.DataFrame, max_value: int, title: str = "", units: str = ""
 ) -> go.Figure:
@@ -127,27 +301,62 @@ def generate_vm_bar_chart(
     Returns:
         go.Figure: A Plotly figure object.
     """
-    fig = px.bar(
-        df,
-        title=title,
-        x="Use",
-        y=Y_AXIS_LABEL,
-        color=VM_LABEL,
-        hover_name=VM_LABEL,
-        hover_data={
-            VM_LABEL: False,
-            "Host": False,
-        },
-    )
+    df = _aggregate_small_vms(df)
+
+    # One stacked bar per virtual machine, so each is colored separately.
+    bars = [
+        go.Bar(
+            x=[use],
+            y=[host],
+            name=vm,
+            hovertext=[vm],
+            hovertemplate="<b>%{hovertext}</b><br><br>Use=%{x}<extra></extra>",
+            orientation="h",
+        )
+        for host, use, vm in zip(
+            df[Y_AXIS_LABEL].tolist(), df["Use"].tolist(), df[VM_LABEL].tolist()
+        )
+    ]
 
-    fig.layout.xaxis.type = "linear"
-    fig.update_xaxes(range=[0, max_value])
+    fig = go.Figure(bars, layout=_BASE_LAYOUT)
     fig.update_layout(
-        margin=dict(l=40, r=40, t=40, b=40),
-        xaxis_title=f"Usage ({units})",
-        yaxis_title=None,
-        showlegend=False,
-        font=dict(size=11),
+        title_text=title,
+        barmode="relative",
+        xaxis_range=[0, max_value],
+        xaxis_title_text=f"Usage ({units})",
     )
 
     return fig
+
+
+def cached_figure(generate_chart: Callable[..., go.Figure], df: pd.DataFrame, *args) -> dict:
+    """Generates a chart as a JSON-serializable dict, reusing the result for repeated inputs.
+
+    Dash serializes every returned figure, which is costly for large charts. Caching the already
+    serialized figure, keyed by the contents of the DataFrame and the chart arguments, means
+    repeated renders skip both building and serializing the figure.
+
+    Args:
+        generate_chart: The chart function to call, e.g. ``generate_percent_chart``.
+        df (pd.DataFrame): A DataFrame containing the data to plot.
+        *args: The remaining arguments of ``generate_chart``.
+
+    Returns:
+        dict: The figure as a dict that can be passed directly to a ``dcc.Graph``.
+    """
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(df).values.tobytes())
+    digest.update(repr((generate_chart.__name__, list(df.columns), args)).encode())
+    key = digest.hexdigest()
+
+    if key in _figure_cache:
+        _figure_cache.move_to_end(key)
+        return _figure_cache[key]
+
+    fig = generate_chart(df, *args)
+    fig_dict = orjson.loads(pio.to_json(fig, validate=False, engine="orjson"))
+
+    _figure_cache[key] = fig_dict
+    if len(_figure_cache) > FIGURE_CACHE_SIZE:
+        _figure_cache.popitem(last=False)
+
+    return fig_dict
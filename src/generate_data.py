@@ -13,26 +13,29 @@
 # limitations under the License.
 
 import math
-import random
+
+import numpy as np
 
 from demo_configs import CPU_CAP, MEMORY_CAP, RANDOM_SEED
 from src.demo_enums import PriorityType
 
 
-def generate_resource_use(num_vms: int, total_resource: list[int]) -> list[float]:
+def generate_resource_use(
+    num_vms: int, total_resource: list[int], rng: np.random.Generator
+) -> list[float]:
     """Generates a random list of virtual machine resource use for a given number of VMs.
 
     Args:
         num_vms: The number of virtual machines assigned to this host.
         total_resource: The amount of resource this host has allocated to its' VMs.
+        rng: The random number generator to draw from.
 
     Returns:
         list[float]: A dict of VM resource assignments where the index+1 is the VM id.
     """
-    random_floats = [random.random() for _ in range(num_vms)]
-    scale_resource = total_resource / sum(random_floats)
-    resource_use = [rand_float * scale_resource for rand_float in random_floats]
-    return resource_use
+    random_floats = rng.random(num_vms)
+    random_floats *= total_resource / random_floats.sum()
+    return random_floats.tolist()
 
 
 def generate_vms(total_vms: int, total_hosts: int) -> dict[dict]:
@@ -45,37 +48,44 @@ def generate_vms(total_vms: int, total_hosts: int) -> dict[dict]:
         total_hosts: The total number of available hosts.
 
     Returns:
-        dict[dict]: A dict of VM dicts containing current host and cpu and memory use.
+        dict[dict]: A dict of VM dicts containing current host (and its zero-based index
+        ``host_idx``) and cpu and memory use.
     """
-    random.seed(RANDOM_SEED)
+    rng = np.random.default_rng(RANDOM_SEED)
 
     # force each host to have at least base_vm_count VMs
     base_vm_count = math.floor(total_vms / (2 * total_hosts))
     remaining_vms = total_vms - (base_vm_count * total_hosts)
 
     # Divide total_vms into total_hosts parts
-    divides = (
-        [0] + sorted(random.sample(range(1, remaining_vms), total_hosts - 1)) + [remaining_vms]
-    )
-    vms_per_host = [divides[i + 1] - divides[i] + base_vm_count for i in range(total_hosts)]
+    divides = np.sort(rng.choice(remaining_vms - 1, size=total_hosts - 1, replace=False) + 1)
+    divides = np.concatenate(([0], divides, [remaining_vms]))
+    vms_per_host = (np.diff(divides) + base_vm_count).tolist()
 
     # Get cpu/memory use per host, use step size of 3 to help create unbalance.
-    total_cpu = random.sample(range(math.ceil(CPU_CAP * 0.25), math.floor(CPU_CAP), 3), total_hosts)
-    total_memory = random.sample(
-        range(math.ceil(MEMORY_CAP * 0.25), math.floor(MEMORY_CAP), 3), total_hosts
-    )
+    total_cpu = rng.choice(
+        np.arange(math.ceil(CPU_CAP * 0.25), math.floor(CPU_CAP), 3),
+        size=total_hosts,
+        replace=False,
+    ).tolist()
+    total_memory = rng.choice(
+        np.arange(math.ceil(MEMORY_CAP * 0.25), math.floor(MEMORY_CAP), 3),
+        size=total_hosts,
+        replace=False,
+    ).tolist()
 
     vms = {}
     vm_count = 1
     for host, num_vms in enumerate(vms_per_host):
         host_name = f"Host {host+1}"
-        cpu_use = generate_resource_use(num_vms, total_cpu[host])
-        mem_use = generate_resource_use(num_vms, total_memory[host])
+        cpu_use = generate_resource_use(num_vms, total_cpu[host], rng)
+        mem_use = generate_resource_use(num_vms, total_memory[host], rng)
 
         for cpu, mem in zip(cpu_use, mem_use):
             vms[f"VM {vm_count}"] = {
                 "status": "Running",
                 "current_host": host_name,
+                "host_idx": host,
                 "cpu": cpu,
                 "mem": mem,
             }
@@ -93,24 +103,32 @@ def generate_hosts(total_hosts: int, vms: dict[dict]) -> dict[dict]:
         vms: A dict of VM dicts containing current host and cpu and memory use.
 
     Returns:
-        dict[dict]: A dict of host dicts containing the CPU and memory cap as well as
-        the current CPU and memory use.
+        dict[dict]: A dict of host dicts containing the zero-based host index ``host_idx``, the
+        CPU and memory cap as well as the current CPU and memory use.
     """
-    hosts = {}
-    cpu_used = [0] * total_hosts
-    mem_used = [0] * total_hosts
+    host_indices = []
+    vm_cpu = []
+    vm_mem = []
     for vm in vms.values():
-        host_index = int(vm["current_host"].split(" ")[1]) - 1
-        cpu_used[host_index] += vm["cpu"]
-        mem_used[host_index] += vm["mem"]
+        host_indices.append(vm["host_idx"])
+        vm_cpu.append(vm["cpu"])
+        vm_mem.append(vm["mem"])
+
+    # Sum the use of the VMs on each host.
+    host_indices = np.array(host_indices, dtype=np.int64)
+    cpu_used = np.bincount(host_indices, weights=vm_cpu, minlength=total_hosts).tolist()
+    mem_used = np.bincount(host_indices, weights=vm_mem, minlength=total_hosts).tolist()
 
-    for host, (cpu, mem) in enumerate(zip(cpu_used, mem_used)):
-        hosts[f"Host {host+1}"] = {
+    hosts = {
+        f"Host {host+1}": {
             "processor_type": "CPU",
+            "host_idx": host,
             "cpu_used": cpu,
             "mem_used": mem,
             "cpu_cap": CPU_CAP,
             "mem_cap": MEMORY_CAP,
         }
+        for host, (cpu, mem) in enumerate(zip(cpu_used, mem_used))
+    }
 
     return hosts
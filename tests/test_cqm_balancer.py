@@ -1,6 +1,7 @@
 import unittest
+from unittest import mock
 
-from dimod import BINARY
+from dimod import BINARY, BinaryQuadraticModel, ConstrainedQuadraticModel, SampleSet
 
 from demo_configs import CPU_CAP, MEMORY_CAP
 from src import cqm_balancer
@@ -14,18 +15,21 @@ class TestCqmBalancer(unittest.TestCase):
             "VM 1": {
                 "status": "Running",
                 "current_host": "Host 1",
+                "host_idx": 0,
                 "cpu": CPU_CAP / 4,
                 "mem": MEMORY_CAP / 4,
             },
             "VM 2": {
                 "status": "Running",
                 "current_host": "Host 2",
+                "host_idx": 1,
                 "cpu": CPU_CAP / 4,
                 "mem": MEMORY_CAP / 4,
             },
             "VM 3": {
                 "status": "Running",
                 "current_host": "Host 2",
+                "host_idx": 1,
                 "cpu": CPU_CAP / 2,
                 "mem": MEMORY_CAP / 2,
             },
@@ -34,6 +38,7 @@ class TestCqmBalancer(unittest.TestCase):
         hosts = {
             "Host 1": {
                 "processor_type": "CPU",
+                "host_idx": 0,
                 "cpu_used": CPU_CAP / 4,
                 "mem_used": MEMORY_CAP / 4,
                 "cpu_cap": CPU_CAP,
@@ -41,6 +46,7 @@ class TestCqmBalancer(unittest.TestCase):
             },
             "Host 2": {
                 "processor_type": "CPU",
+                "host_idx": 1,
                 "cpu_used": CPU_CAP * 3 / 4,
                 "mem_used": MEMORY_CAP * 3 / 4,
                 "cpu_cap": CPU_CAP,
@@ -73,18 +79,21 @@ class TestCqmBalancer(unittest.TestCase):
             "VM 1": {
                 "status": "Running",
                 "current_host": "Host 1",
+                "host_idx": 0,
                 "cpu": CPU_CAP / 4,
                 "mem": MEMORY_CAP / 4,
             },
             "VM 2": {
                 "status": "Running",
                 "current_host": "Host 1",
+                "host_idx": 0,
                 "cpu": CPU_CAP / 4,
                 "mem": MEMORY_CAP / 4,
             },
             "VM 3": {
                 "status": "Running",
                 "current_host": "Host 2",
+                "host_idx": 1,
                 "cpu": CPU_CAP / 2,
                 "mem": MEMORY_CAP / 2,
             },
@@ -93,6 +102,7 @@ class TestCqmBalancer(unittest.TestCase):
         hosts = {
             "Host 1": {
                 "processor_type": "CPU",
+                "host_idx": 0,
                 "cpu_used": CPU_CAP / 2,
                 "mem_used": MEMORY_CAP / 2,
                 "cpu_cap": CPU_CAP,
@@ -100,6 +110,7 @@ class TestCqmBalancer(unittest.TestCase):
             },
             "Host 2": {
                 "processor_type": "CPU",
+                "host_idx": 1,
                 "cpu_used": CPU_CAP / 2,
                 "mem_used": MEMORY_CAP / 2,
                 "cpu_cap": CPU_CAP,
@@ -118,3 +129,34 @@ class TestCqmBalancer(unittest.TestCase):
             constraint.lhs.is_linear() for constraint in cqm.constraints.values()
         )
         self.assertEqual(num_linear_constraints, len(hosts) * len(vms) + 1)
+
+    def test_get_solution(self):
+        """Test the solution contains the assigned variables of the best sample"""
+        cqm = ConstrainedQuadraticModel()
+        cqm.set_objective(
+            BinaryQuadraticModel(
+                {
+                    "VM 1_on_Host 1": 2,
+                    "VM 1_on_Host 2": 1,
+                    "VM 2_on_Host 1": 1,
+                    "VM 2_on_Host 2": 3,
+                },
+                {},
+                0,
+                BINARY,
+            )
+        )
+
+        # The best sample (lowest energy) is not the first one given.
+        samples = [[1, 0, 0, 1], [0, 1, 1, 0], [1, 0, 1, 0]]
+        sampleset = SampleSet.from_samples_cqm((samples, list(cqm.variables)), cqm)
+
+        sampler = mock.Mock()
+        sampler.sample_cqm.return_value = sampleset
+
+        with mock.patch.object(cqm_balancer, "LeapHybridCQMSampler", return_value=sampler):
+            plan = cqm_balancer.get_solution(cqm, 5)
+
+        # Check the plan matches the assigned variables of the best sample
+        self.assertEqual(plan, [k for k, v in sampleset.first.sample.items() if v == 1])
+        self.assertEqual(plan, ["VM 1_on_Host 2", "VM 2_on_Host 1"])
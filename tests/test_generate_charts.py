@@ -1,3 +1,4 @@
+import copy
 import unittest
 
 import pandas as pd
@@ -14,12 +15,14 @@ class TestGenerateCharts(unittest.TestCase):
             "VM 1": {
                 "status": "Running",
                 "current_host": "Host 1",
+                "host_idx": 0,
                 "cpu": CPU_CAP / 4,
                 "mem": MEMORY_CAP / 4,
             },
             "VM 2": {
                 "status": "Running",
                 "current_host": "Host 1",
+                "host_idx": 0,
                 "cpu": CPU_CAP / 4,
                 "mem": MEMORY_CAP / 4,
             },
@@ -28,6 +31,7 @@ class TestGenerateCharts(unittest.TestCase):
         hosts = {
             "Host 1": {
                 "processor_type": "CPU",
+                "host_idx": 0,
                 "cpu_used": CPU_CAP / 2,
                 "mem_used": MEMORY_CAP / 2,
                 "cpu_cap": CPU_CAP,
@@ -51,6 +55,58 @@ class TestGenerateCharts(unittest.TestCase):
         # Check correct use
         self.assertEqual(df.at[0, "Use"], CPU_CAP / 4)
 
+    def test_get_dfs(self):
+        """Test if memory and CPU DataFrames are generated in one pass"""
+        vms = {
+            "VM 1": {
+                "status": "Running",
+                "current_host": "Host 2",
+                "host_idx": 1,
+                "cpu": CPU_CAP / 4,
+                "mem": MEMORY_CAP / 2,
+            },
+            "VM 2": {
+                "status": "Running",
+                "current_host": "Host 1",
+                "host_idx": 0,
+                "cpu": CPU_CAP / 2,
+                "mem": MEMORY_CAP / 4,
+            },
+        }
+
+        hosts = {
+            "Host 1": {
+                "processor_type": "CPU",
+                "host_idx": 0,
+                "cpu_used": CPU_CAP / 2,
+                "mem_used": MEMORY_CAP / 4,
+                "cpu_cap": CPU_CAP,
+                "mem_cap": MEMORY_CAP,
+            },
+            "Host 2": {
+                "processor_type": "CPU",
+                "host_idx": 1,
+                "cpu_used": CPU_CAP / 4,
+                "mem_used": MEMORY_CAP / 2,
+                "cpu_cap": CPU_CAP,
+                "mem_cap": MEMORY_CAP,
+            },
+        }
+
+        df_mem_percent, df_mem, df_cpu_percent, df_cpu = generate_charts.get_dfs(hosts, vms)
+
+        # Check the results match generating each resource separately
+        for resource, df_percent, df in [
+            ("mem", df_mem_percent, df_mem),
+            ("cpu", df_cpu_percent, df_cpu),
+        ]:
+            expected_percent, expected = generate_charts.get_df(hosts, vms, resource)
+            pd.testing.assert_frame_equal(df_percent, expected_percent)
+            pd.testing.assert_frame_equal(df, expected)
+
+        # Check VMs are sorted by host
+        self.assertEqual(list(df_mem["Virtual Machine"]), ["VM 2", "VM 1"])
+
     def test_generate_percent_chart(self):
         """Test generating the percent chart fig"""
         df = pd.DataFrame(
@@ -103,3 +159,102 @@ class TestGenerateCharts(unittest.TestCase):
         # Check x and y axes
         self.assertEqual(fig_dict["data"][0]["y"], ["Host 1"])
         self.assertEqual(fig_dict["data"][0]["x"], [CPU_CAP / 4])
+
+    def test_generate_vm_bar_chart_aggregates_small_vms(self):
+        """Test the smallest VMs are combined when there are too many bars"""
+        num_vms = generate_charts.MAX_VISIBLE_BARS * 2
+        df = pd.DataFrame(
+            {
+                "Host": [f"Host {i % 2 + 1}" for i in range(num_vms)],
+                "Use": [float(i + 1) for i in range(num_vms)],
+                "Virtual Machine": [f"VM {i + 1}" for i in range(num_vms)],
+                "order": [i % 2 + 1 for i in range(num_vms)],
+            }
+        ).sort_values(by=["order"], kind="stable")
+
+        aggregated = generate_charts._aggregate_small_vms(df)
+
+        # Check the number of bars is bounded
+        self.assertLessEqual(len(aggregated), generate_charts.MAX_VISIBLE_BARS)
+
+        # Check the total use of each host is unchanged
+        for host in ["Host 1", "Host 2"]:
+            self.assertAlmostEqual(
+                aggregated[aggregated["Host"] == host]["Use"].sum(),
+                df[df["Host"] == host]["Use"].sum(),
+            )
+
+        # Check the chart draws one bar per remaining row
+        fig = generate_charts.generate_vm_bar_chart(df, CPU_CAP, "Test Title", "GHz")
+        self.assertEqual(len(fig.data), len(aggregated))
+
+    def test_cached_figure(self):
+        """Test caching the serialized figure"""
+        df = pd.DataFrame(
+            {
+                "Host": ["Host 1"],
+                "Percent": [50],
+            }
+        )
+
+        fig_dict = generate_charts.cached_figure(
+            generate_charts.generate_percent_chart, df, "Test Title"
+        )
+
+        # Check a serializable dict of the figure is returned
+        self.assertTrue(type(fig_dict) is dict)
+        self.assertEqual(fig_dict["layout"]["title"]["text"], "Test Title")
+
+        # Check equal inputs reuse the cached figure and other inputs do not
+        self.assertIs(
+            generate_charts.cached_figure(
+                generate_charts.generate_percent_chart, df.copy(), "Test Title"
+            ),
+            fig_dict,
+        )
+        self.assertIsNot(
+            generate_charts.cached_figure(
+                generate_charts.generate_percent_chart, df, "Other Title"
+            ),
+            fig_dict,
+        )
+
+    def test_patch_percent_chart(self):
+        """Test the percent chart patch targets the bars and mean line of the percent chart"""
+        df = pd.DataFrame(
+            {
+                "Host": ["Host 1", "Host 2"],
+                "Percent": [20, 40],
+            }
+        )
+        fig_dict = copy.deepcopy(
+            generate_charts.cached_figure(generate_charts.generate_percent_chart, df, "Test Title")
+        )
+
+        df_new = pd.DataFrame(
+            {
+                "Host": ["Host 1", "Host 2"],
+                "Percent": [60, 80],
+            }
+        )
+        patch = generate_charts.patch_percent_chart(df_new).to_plotly_json()
+
+        # Check every patched property already exists in the figure before applying it
+        for operation in patch["operations"]:
+            *parents, prop = operation["location"]
+            target = fig_dict
+            for key in parents:
+                target = target[key]
+            self.assertIn(prop, target)
+            target[prop] = operation["params"]["value"]
+
+        # Check the bars and mean line are updated
+        self.assertEqual(fig_dict["data"][0]["x"], [60, 80])
+        self.assertEqual(fig_dict["layout"]["shapes"][0]["x0"], 70)
+        self.assertEqual(fig_dict["layout"]["shapes"][0]["x1"], 70)
+        self.assertEqual(fig_dict["layout"]["annotations"][0]["x"], 70)
+        self.assertEqual(
+            fig_dict["layout"]["annotations"][0]["text"],
+            generate_charts.get_mean_annotation(df_new)[1],
+        )
+        self.assertIn("70%", fig_dict["layout"]["annotations"][0]["text"])
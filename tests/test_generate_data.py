@@ -39,18 +39,21 @@ class TestGenerateData(unittest.TestCase):
             "VM 1": {
                 "status": "Running",
                 "current_host": "Host 1",
+                "host_idx": 0,
                 "cpu": CPU_CAP / 4,
                 "mem": MEMORY_CAP / 4,
             },
             "VM 2": {
                 "status": "Running",
                 "current_host": "Host 1",
+                "host_idx": 0,
                 "cpu": CPU_CAP / 4,
                 "mem": MEMORY_CAP / 4,
             },
             "VM 3": {
                 "status": "Running",
                 "current_host": "Host 2",
+                "host_idx": 1,
                 "cpu": CPU_CAP / 2,
                 "mem": MEMORY_CAP / 2,
             },